@@ -0,0 +1 @@
+"""FastAPI application for the Gemini-powered strands agents."""
@@ -7,7 +7,7 @@ Configuration settings for the Gemini Agent API.
 
 import os
 from typing import Optional
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,6 +16,8 @@ load_dotenv()
 class Settings(BaseSettings):
     """Application settings."""
 
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
+
     # API Configuration
     APP_NAME: str = "Gemini Agent API"
     APP_VERSION: str = "1.0.0"
@@ -25,13 +27,17 @@ class Settings(BaseSettings):
     # Server Configuration
     HOST: str = "0.0.0.0"
     PORT: int = 8000
-    WORKERS: int = 4
+    # Agents, their history and the response cache live in process memory,
+    # so more than one worker needs agent state shared between processes
+    WORKERS: int = 1
+    MAX_BODY_BYTES: int = 1_048_576  # 1 MiB
 
     # Gemini API
     GEMINI_API_KEY: str
     DEFAULT_MODEL: str = "gemini-2.0-flash-exp"
     DEFAULT_TEMPERATURE: float = 0.7
     MAX_TOKENS: Optional[int] = None
+    HISTORY_TURNS: int = 10
 
     # CORS Settings
     CORS_ORIGINS: list = ["*"]
@@ -56,10 +62,6 @@ class Settings(BaseSettings):
     API_KEY_ENABLED: bool = False
     API_KEYS: list = []
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
-
 
 # Create global settings instance
 settings = Settings()
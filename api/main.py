@@ -17,41 +17,128 @@ Features:
 - Tool support (calculator, etc.)
 """
 
-import os
-import sys
+import time
+import queue
+import atexit
+import hashlib
 import logging
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+from logging.handlers import QueueHandler, QueueListener
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Callable, Optional, Tuple
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, status, Depends, BackgroundTasks
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
+import orjson
+from anyio import to_thread
+from fastapi import FastAPI, HTTPException, Request, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
 from dotenv import load_dotenv
-
-# Add parent directory to path for imports
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from gemini_agent import GeminiAgent, MultiAgentSystem
+from api.config import settings
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('api.log'),
-        logging.StreamHandler()
-    ]
-)
+# Configure logging: records are queued on the calling thread, then formatted
+# and written to the file/stream handlers by a background listener thread
+_log_formatter = logging.Formatter(settings.LOG_FORMAT)
+_log_handlers = [
+    logging.FileHandler(settings.LOG_FILE),
+    logging.StreamHandler()
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+
+class InProcessQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves all message formatting to the listener thread.
+
+    The stdlib handler pre-renders each record so it can be pickled; these
+    records never leave the process, so they are queued unchanged.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+log_listener = QueueListener(log_queue, *_log_handlers, respect_handler_level=True)
+# Started together with the queue handler, so no record is queued while no
+# listener is running (at import, with --lifespan off, or from scripts), and
+# stopped at interpreter exit to flush what is left
+log_listener.start()
+atexit.register(log_listener.stop)
+_queue_handler = InProcessQueueHandler(log_queue)
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
 logger = logging.getLogger(__name__)
 
 # Global variables
 agent_system: Optional[MultiAgentSystem] = None
 
+# Maximum number of concurrent blocking agent calls per worker
+THREAD_POOL_SIZE = 64
+
+# Response cache for deterministic NLP endpoints
+RESPONSE_CACHE_SIZE = 1024
+RESPONSE_CACHE_TTL = 3600  # seconds
+CACHE_MAX_TEMPERATURE = 0.5
+
+
+# Cached (epoch second, ISO timestamp) pair shared by all requests
+_ts_cache = [0, ""]
+
+
+def now_iso() -> str:
+    """
+    Get the current UTC time as an ISO 8601 string at second resolution.
+
+    The formatted string is rebuilt at most once per second.
+    """
+    now = int(time.time())
+    if now != _ts_cache[0]:
+        _ts_cache[1] = datetime.fromtimestamp(now, timezone.utc).replace(tzinfo=None).isoformat()
+        _ts_cache[0] = now
+    return _ts_cache[1]
+
+
+class ResponseCache:
+    """
+    Bounded in-process LRU cache with expiry for agent responses.
+
+    Only accessed from the event loop, so no locking is needed.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple, Tuple[float, str]]" = OrderedDict()
+
+    def get(self, key: Tuple) -> Optional[str]:
+        """Return the cached value for key, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Tuple, value: str):
+        """Store value under key, evicting the least recently used entry if full."""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
+
 
 # Lifespan context manager for startup and shutdown
 @asynccontextmanager
@@ -63,15 +150,25 @@ async def lifespan(app: FastAPI):
 
     # Startup
     logger.info("Starting up API server...")
+    to_thread.current_default_thread_limiter().total_tokens = THREAD_POOL_SIZE
     try:
-        agent_system = MultiAgentSystem()
+        agent_system = MultiAgentSystem(
+            api_key=settings.GEMINI_API_KEY,
+            history_turns=settings.HISTORY_TURNS
+        )
         # Create default agent
-        agent_system.create_agent("default", temperature=0.7)
+        agent_system.create_agent(
+            "default",
+            temperature=settings.DEFAULT_TEMPERATURE,
+            model_name=settings.DEFAULT_MODEL
+        )
         logger.info("Agent system initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize agent system: {e}")
         raise
 
+    app.state.agent_system = agent_system
+
     yield
 
     # Shutdown
@@ -80,43 +177,215 @@ async def lifespan(app: FastAPI):
 
 # Initialize FastAPI app
 app = FastAPI(
-    title="Gemini Agent API",
+    title=settings.APP_NAME,
     description="Production-ready REST API for Gemini-powered strands agent",
-    version="1.0.0",
+    version=settings.APP_VERSION,
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure this appropriately for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+
+# ASGI middleware
+class AgentSystemMiddleware:
+    """
+    Pure ASGI middleware exposing the agent system as ``request.state.mas``.
+
+    Replaces per-request ``Depends`` resolution with a single dict write on
+    the connection scope.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            scope.setdefault("state", {})["mas"] = getattr(scope["app"].state, "agent_system", None)
+        await self.app(scope, receive, send)
+
+
+class ErrorEnvelopeMiddleware:
+    """
+    Pure ASGI middleware rendering unhandled exceptions as the ``ErrorResponse`` envelope.
+
+    HTTP exceptions are handled earlier by ``http_exception_handler``;
+    anything else is logged and returned as a 500.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
+            if response_started:
+                raise
+            await _send_error(
+                send,
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+                {"error": "Internal server error", "detail": str(exc), "timestamp": now_iso()}
+            )
+
+
+class BodySizeLimitMiddleware:
+    """
+    Pure ASGI middleware rejecting oversized request bodies up front.
+
+    Requests to the text endpoints whose ``Content-Length`` exceeds
+    ``settings.MAX_BODY_BYTES`` get a 413 before the body is read or parsed.
+    """
+
+    LIMITED_PATHS = frozenset({"/message", "/message/stream", "/summarize", "/sentiment", "/question", "/analyze"})
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in self.LIMITED_PATHS:
+            for key, value in scope["headers"]:
+                if key == b"content-length":
+                    if value.isdigit() and int(value) > settings.MAX_BODY_BYTES:
+                        await _send_error(
+                            send,
+                            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            {"error": "Request body too large", "detail": None, "timestamp": now_iso()}
+                        )
+                        return
+                    break
+        await self.app(scope, receive, send)
+
+
+class FastCORS:
+    """
+    Minimal pure ASGI CORS handler for the allow-all configuration.
+
+    Adds static CORS headers to responses for cross-origin requests and
+    answers preflight requests directly with a 204.
+    """
+
+    ALLOW_METHODS = b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+    MAX_AGE = b"600"
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        request_headers = None
+        is_preflight = False
+        for key, value in scope["headers"]:
+            if key == b"origin":
+                origin = value
+            elif key == b"access-control-request-method":
+                is_preflight = True
+            elif key == b"access-control-request-headers":
+                request_headers = value
+
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Credentials are allowed, so the origin is echoed instead of "*"
+        cors_headers = [
+            (b"access-control-allow-origin", origin),
+            (b"access-control-allow-credentials", b"true"),
+            (b"vary", b"Origin"),
+        ]
+
+        if is_preflight and scope["method"] == "OPTIONS":
+            cors_headers.append((b"access-control-allow-methods", self.ALLOW_METHODS))
+            cors_headers.append((b"access-control-max-age", self.MAX_AGE))
+            if request_headers is not None:
+                cors_headers.append((b"access-control-allow-headers", request_headers))
+            await send({"type": "http.response.start", "status": 204, "headers": cors_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + cors_headers
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+async def _send_error(send, status_code: int, content: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+    """Send a JSON error response directly over the ASGI channel."""
+    body = orjson.dumps(content)
+    raw_headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode("latin-1")),
+    ]
+    if headers:
+        raw_headers.extend((k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers.items())
+    await send({"type": "http.response.start", "status": status_code, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> ORJSONResponse:
+    """Handle HTTP exceptions, including Starlette's own 404/405, with the error envelope."""
+    return ORJSONResponse(
+        status_code=exc.status_code,
+        content={"error": exc.detail, "detail": None, "timestamp": now_iso()},
+        headers=exc.headers
+    )
+
+
+# Replaces FastAPI's default {"detail": ...} handler in Starlette's ExceptionMiddleware
+app.add_exception_handler(StarletteHTTPException, http_exception_handler)
+
+app.add_middleware(AgentSystemMiddleware)
+app.add_middleware(ErrorEnvelopeMiddleware)
+app.add_middleware(BodySizeLimitMiddleware)
+
+# Configure CORS (outermost, so error responses carry CORS headers too).
+# Allows all origins; configure this appropriately for production
+app.add_middleware(FastCORS)
 
 
 # Pydantic models for request/response validation
 class MessageRequest(BaseModel):
     """Request model for sending a message."""
-    message: str = Field(..., min_length=1, max_length=10000, description="User message")
-    agent_name: str = Field(default="default", description="Name of the agent to use")
-    system_prompt: Optional[str] = Field(None, description="Optional system prompt")
-
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        extra="forbid",
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "message": "Explain quantum computing in simple terms",
                 "agent_name": "default",
                 "system_prompt": "You are a helpful assistant."
             }
         }
+    )
+
+    message: str = Field(..., min_length=1, max_length=10000, description="User message")
+    agent_name: str = Field(default="default", description="Name of the agent to use")
+    system_prompt: Optional[str] = Field(None, description="Optional system prompt")
 
 
 class MessageResponse(BaseModel):
     """Response model for message."""
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     response: str
     agent_name: str
     timestamp: str
@@ -125,26 +394,54 @@ class MessageResponse(BaseModel):
 
 class SummarizeRequest(BaseModel):
     """Request model for text summarization."""
-    text: str = Field(..., min_length=1, description="Text to summarize")
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    text: str = Field(..., min_length=1, max_length=100_000, description="Text to summarize")
     max_length: int = Field(default=200, ge=10, le=1000, description="Maximum summary length in words")
     agent_name: str = Field(default="default", description="Name of the agent to use")
 
 
 class SentimentRequest(BaseModel):
     """Request model for sentiment analysis."""
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     text: str = Field(..., min_length=1, max_length=5000, description="Text to analyze")
     agent_name: str = Field(default="default", description="Name of the agent to use")
 
 
 class QuestionRequest(BaseModel):
     """Request model for question answering."""
-    question: str = Field(..., min_length=1, description="Question to answer")
-    context: Optional[str] = Field(None, description="Optional context for answering")
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    question: str = Field(..., min_length=1, max_length=100_000, description="Question to answer")
+    context: Optional[str] = Field(None, max_length=100_000, description="Optional context for answering")
     agent_name: str = Field(default="default", description="Name of the agent to use")
 
 
+class AnalyzeRequest(BaseModel):
+    """Request model for combined text analysis."""
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    text: str = Field(..., min_length=1, max_length=100_000, description="Text to analyze")
+    max_length: int = Field(default=200, ge=10, le=1000, description="Maximum summary length in words")
+    agent_name: str = Field(default="default", description="Name of the agent to use")
+
+
+class AnalyzeResponse(BaseModel):
+    """Response model for combined text analysis."""
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    summary: str
+    sentiment: str
+    entities: Dict[str, Any]
+    agent_name: str
+    timestamp: str
+
+
 class CreateAgentRequest(BaseModel):
     """Request model for creating a new agent."""
+    model_config = ConfigDict(extra="forbid", frozen=True, protected_namespaces=())
+
     name: str = Field(..., min_length=1, max_length=50, description="Agent name")
     temperature: float = Field(default=0.7, ge=0.0, le=1.0, description="Temperature setting")
     model_name: str = Field(default="gemini-2.0-flash-exp", description="Model name")
@@ -152,6 +449,8 @@ class CreateAgentRequest(BaseModel):
 
 class AgentInfo(BaseModel):
     """Information about an agent."""
+    model_config = ConfigDict(extra="forbid", frozen=True, protected_namespaces=())
+
     name: str
     model_name: str
     temperature: float
@@ -160,6 +459,8 @@ class AgentInfo(BaseModel):
 
 class HealthResponse(BaseModel):
     """Health check response."""
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     status: str
     timestamp: str
     version: str
@@ -168,45 +469,93 @@ class HealthResponse(BaseModel):
 
 class ErrorResponse(BaseModel):
     """Error response model."""
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     error: str
     detail: Optional[str] = None
     timestamp: str
 
 
-# Dependency to get agent system
-def get_agent_system() -> MultiAgentSystem:
-    """Dependency to get the agent system."""
-    if agent_system is None:
+# Accessor for the agent system injected by AgentSystemMiddleware
+def get_agent_system(request: Request) -> MultiAgentSystem:
+    """Get the agent system from the request state."""
+    mas = getattr(request.state, "mas", None)
+    if mas is None:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Agent system not initialized"
         )
-    return agent_system
+    return mas
+
+
+def _message_response(response: str, agent_name: str) -> ORJSONResponse:
+    """
+    Build a ``MessageResponse``-shaped response without re-validating it.
+
+    Returning a Response instance skips FastAPI's ``response_model``
+    validation and serialization; the model still documents the schema.
+    """
+    return ORJSONResponse({
+        "response": response,
+        "agent_name": agent_name,
+        "timestamp": now_iso(),
+        "tokens_used": None
+    })
+
+
+async def _nlp_call(agent_name: str, agent: GeminiAgent, prompt: str, func: Callable[..., str], *args) -> str:
+    """
+    Run an NLP agent method, answering low-temperature agents from the cache.
+
+    Low-temperature agents, whose output is close to deterministic, answer
+    ``prompt`` statelessly via GeminiAgent.complete, so the result depends
+    only on the prompt and a hit or a miss equally leaves the conversation
+    history alone; errors are raised and never cached. Other agents run
+    ``func(*args)`` as part of their conversation.
+    """
+    if agent.temperature > CACHE_MAX_TEMPERATURE:
+        return await agent.run_locked(func, *args)
+
+    digest = hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()
+    key = (agent_name, agent.model_name, agent.temperature, digest)
+
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = await to_thread.run_sync(agent.complete, prompt)
+    response_cache.set(key, result)
+    return result
 
 
 # API Endpoints
+# The root response is static, so it is serialized once at import
+_ROOT_BYTES = orjson.dumps({
+    "message": settings.APP_NAME,
+    "version": settings.APP_VERSION,
+    "docs": "/docs",
+    "health": "/health"
+})
+
+
 @app.get("/", tags=["General"])
 async def root():
     """Root endpoint."""
-    return {
-        "message": "Gemini Agent API",
-        "version": "1.0.0",
-        "docs": "/docs",
-        "health": "/health"
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 
 @app.get("/health", response_model=HealthResponse, tags=["General"])
-async def health_check(mas: MultiAgentSystem = Depends(get_agent_system)):
+async def health_check(request: Request):
     """
     Health check endpoint.
 
     Returns the current status of the API and agent system.
     """
+    mas = get_agent_system(request)
     return HealthResponse(
         status="healthy",
-        timestamp=datetime.utcnow().isoformat(),
-        version="1.0.0",
+        timestamp=now_iso(),
+        version=settings.APP_VERSION,
         agents_active=len(mas.list_agents())
     )
 
@@ -214,8 +563,7 @@ async def health_check(mas: MultiAgentSystem = Depends(get_agent_system)):
 @app.post("/message", response_model=MessageResponse, tags=["Chat"])
 async def send_message(
     request: MessageRequest,
-    background_tasks: BackgroundTasks,
-    mas: MultiAgentSystem = Depends(get_agent_system)
+    http_request: Request
 ):
     """
     Send a message to an agent and get a response.
@@ -224,6 +572,7 @@ async def send_message(
     - **agent_name**: Name of the agent to use (default: "default")
     - **system_prompt**: Optional system prompt to guide the response
     """
+    mas = get_agent_system(http_request)
     try:
         agent = mas.get_agent(request.agent_name)
         if not agent:
@@ -232,22 +581,20 @@ async def send_message(
                 detail=f"Agent '{request.agent_name}' not found"
             )
 
-        # Send message
-        response = agent.send_message(request.message, request.system_prompt)
-
-        # Log in background
-        background_tasks.add_task(
-            logger.info,
-            f"Message processed - Agent: {request.agent_name}, "
-            f"Message length: {len(request.message)}, "
-            f"Response length: {len(response)}"
+        # Send message on the event loop, over the same stream as /message/stream
+        response = await agent.send_message_async(request.message, request.system_prompt)
+
+        # Arguments are interpolated on the log listener thread; the same
+        # values are attached as record attributes for structured handlers
+        msg_len = len(request.message)
+        resp_len = len(response)
+        logger.info(
+            "Message processed - Agent: %s, Message length: %d, Response length: %d",
+            request.agent_name, msg_len, resp_len,
+            extra={"agent": request.agent_name, "msg_len": msg_len, "resp_len": resp_len}
         )
 
-        return MessageResponse(
-            response=response,
-            agent_name=request.agent_name,
-            timestamp=datetime.utcnow().isoformat()
-        )
+        return _message_response(response, request.agent_name)
 
     except HTTPException:
         raise
@@ -259,10 +606,48 @@ async def send_message(
         )
 
 
+@app.post("/message/stream", tags=["Chat"])
+async def stream_message(
+    request: MessageRequest,
+    http_request: Request
+):
+    """
+    Send a message to an agent and stream the response as Server-Sent Events.
+
+    Each event carries a JSON object ``{"delta": "<text>"}``; the stream
+    ends with a ``[DONE]`` event, or with an ``error`` event carrying
+    ``{"error": "<message>"}`` if generation fails.
+
+    - **message**: The message to send
+    - **agent_name**: Name of the agent to use (default: "default")
+    - **system_prompt**: Optional system prompt to guide the response
+    """
+    mas = get_agent_system(http_request)
+    agent = mas.get_agent(request.agent_name)
+    if not agent:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Agent '{request.agent_name}' not found"
+        )
+
+    async def event_stream():
+        try:
+            async for chunk in agent.stream_message(request.message, request.system_prompt):
+                yield b"data: " + orjson.dumps({"delta": chunk}) + b"\n\n"
+        except Exception as e:
+            # The response has already started, so report the failure in-band
+            logger.error(f"Error streaming message: {str(e)}")
+            yield b"event: error\ndata: " + orjson.dumps({"error": f"Error generating response: {str(e)}"}) + b"\n\n"
+            return
+        yield b"data: [DONE]\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @app.post("/summarize", response_model=MessageResponse, tags=["NLP"])
 async def summarize_text(
     request: SummarizeRequest,
-    mas: MultiAgentSystem = Depends(get_agent_system)
+    http_request: Request
 ):
     """
     Summarize a text.
@@ -271,6 +656,7 @@ async def summarize_text(
     - **max_length**: Maximum length of summary in words (default: 200)
     - **agent_name**: Name of the agent to use
     """
+    mas = get_agent_system(http_request)
     try:
         agent = mas.get_agent(request.agent_name)
         if not agent:
@@ -279,14 +665,13 @@ async def summarize_text(
                 detail=f"Agent '{request.agent_name}' not found"
             )
 
-        summary = agent.summarize(request.text, request.max_length)
-
-        return MessageResponse(
-            response=summary,
-            agent_name=request.agent_name,
-            timestamp=datetime.utcnow().isoformat()
+        summary = await _nlp_call(
+            request.agent_name, agent, agent.summary_prompt(request.text, request.max_length),
+            agent.summarize, request.text, request.max_length
         )
 
+        return _message_response(summary, request.agent_name)
+
     except HTTPException:
         raise
     except Exception as e:
@@ -300,7 +685,7 @@ async def summarize_text(
 @app.post("/sentiment", response_model=MessageResponse, tags=["NLP"])
 async def analyze_sentiment(
     request: SentimentRequest,
-    mas: MultiAgentSystem = Depends(get_agent_system)
+    http_request: Request
 ):
     """
     Analyze the sentiment of a text.
@@ -308,6 +693,7 @@ async def analyze_sentiment(
     - **text**: Text to analyze
     - **agent_name**: Name of the agent to use
     """
+    mas = get_agent_system(http_request)
     try:
         agent = mas.get_agent(request.agent_name)
         if not agent:
@@ -316,14 +702,13 @@ async def analyze_sentiment(
                 detail=f"Agent '{request.agent_name}' not found"
             )
 
-        sentiment = agent.analyze_sentiment(request.text)
-
-        return MessageResponse(
-            response=sentiment,
-            agent_name=request.agent_name,
-            timestamp=datetime.utcnow().isoformat()
+        sentiment = await _nlp_call(
+            request.agent_name, agent, agent.sentiment_prompt(request.text),
+            agent.analyze_sentiment, request.text
         )
 
+        return _message_response(sentiment, request.agent_name)
+
     except HTTPException:
         raise
     except Exception as e:
@@ -334,10 +719,51 @@ async def analyze_sentiment(
         )
 
 
+@app.post("/analyze", response_model=AnalyzeResponse, tags=["NLP"])
+async def analyze_text(
+    request: AnalyzeRequest,
+    http_request: Request
+):
+    """
+    Summarize, analyze sentiment and extract entities in one model round-trip.
+
+    Prefer this over separate /summarize and /sentiment calls on the same text.
+
+    - **text**: Text to analyze
+    - **max_length**: Maximum length of summary in words (default: 200)
+    - **agent_name**: Name of the agent to use
+    """
+    mas = get_agent_system(http_request)
+    try:
+        agent = mas.get_agent(request.agent_name)
+        if not agent:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Agent '{request.agent_name}' not found"
+            )
+
+        analysis = await agent.run_locked(agent.analyze_all, request.text, request.max_length)
+
+        return ORJSONResponse({
+            **analysis,
+            "agent_name": request.agent_name,
+            "timestamp": now_iso()
+        })
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error analyzing text: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error analyzing text: {str(e)}"
+        )
+
+
 @app.post("/question", response_model=MessageResponse, tags=["QA"])
 async def answer_question(
     request: QuestionRequest,
-    mas: MultiAgentSystem = Depends(get_agent_system)
+    http_request: Request
 ):
     """
     Answer a question, optionally with provided context.
@@ -346,6 +772,7 @@ async def answer_question(
     - **context**: Optional context to use for answering
     - **agent_name**: Name of the agent to use
     """
+    mas = get_agent_system(http_request)
     try:
         agent = mas.get_agent(request.agent_name)
         if not agent:
@@ -354,13 +781,16 @@ async def answer_question(
                 detail=f"Agent '{request.agent_name}' not found"
             )
 
-        answer = agent.answer_question(request.question, request.context)
+        if request.context:
+            answer = await _nlp_call(
+                request.agent_name, agent, agent.question_prompt(request.question, request.context),
+                agent.answer_question, request.question, request.context
+            )
+        else:
+            # Without context the answer depends on the conversation so far
+            answer = await agent.run_locked(agent.answer_question, request.question)
 
-        return MessageResponse(
-            response=answer,
-            agent_name=request.agent_name,
-            timestamp=datetime.utcnow().isoformat()
-        )
+        return _message_response(answer, request.agent_name)
 
     except HTTPException:
         raise
@@ -375,7 +805,7 @@ async def answer_question(
 @app.post("/agents", response_model=AgentInfo, tags=["Agent Management"], status_code=status.HTTP_201_CREATED)
 async def create_agent(
     request: CreateAgentRequest,
-    mas: MultiAgentSystem = Depends(get_agent_system)
+    http_request: Request
 ):
     """
     Create a new agent.
@@ -384,6 +814,7 @@ async def create_agent(
     - **temperature**: Temperature setting (0.0 to 1.0)
     - **model_name**: Model to use
     """
+    mas = get_agent_system(http_request)
     try:
         # Check if agent already exists
         if mas.get_agent(request.name):
@@ -404,7 +835,7 @@ async def create_agent(
             name=request.name,
             model_name=request.model_name,
             temperature=request.temperature,
-            created_at=datetime.utcnow().isoformat()
+            created_at=now_iso()
         )
 
     except HTTPException:
@@ -418,25 +849,27 @@ async def create_agent(
 
 
 @app.get("/agents", response_model=List[str], tags=["Agent Management"])
-async def list_agents(mas: MultiAgentSystem = Depends(get_agent_system)):
+async def list_agents(request: Request):
     """
     List all active agents.
 
     Returns a list of agent names.
     """
+    mas = get_agent_system(request)
     return mas.list_agents()
 
 
 @app.delete("/agents/{agent_name}", tags=["Agent Management"], status_code=status.HTTP_204_NO_CONTENT)
 async def delete_agent(
     agent_name: str,
-    mas: MultiAgentSystem = Depends(get_agent_system)
+    http_request: Request
 ):
     """
     Delete an agent.
 
     - **agent_name**: Name of the agent to delete
     """
+    mas = get_agent_system(http_request)
     if agent_name == "default":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -456,13 +889,14 @@ async def delete_agent(
 @app.post("/agents/{agent_name}/clear-history", tags=["Agent Management"])
 async def clear_agent_history(
     agent_name: str,
-    mas: MultiAgentSystem = Depends(get_agent_system)
+    http_request: Request
 ):
     """
     Clear the conversation history of an agent.
 
     - **agent_name**: Name of the agent
     """
+    mas = get_agent_system(http_request)
     agent = mas.get_agent(agent_name)
     if not agent:
         raise HTTPException(
@@ -470,7 +904,8 @@ async def clear_agent_history(
             detail=f"Agent '{agent_name}' not found"
         )
 
-    agent.clear_history()
+    # Waits for any in-flight message on this agent before clearing
+    await agent.run_locked(agent.clear_history)
     logger.info(f"Cleared history for agent: {agent_name}")
 
     return {"message": f"History cleared for agent '{agent_name}'"}
@@ -479,13 +914,14 @@ async def clear_agent_history(
 @app.get("/agents/{agent_name}/history", tags=["Agent Management"])
 async def get_agent_history(
     agent_name: str,
-    mas: MultiAgentSystem = Depends(get_agent_system)
+    http_request: Request
 ):
     """
     Get the conversation history of an agent.
 
     - **agent_name**: Name of the agent
     """
+    mas = get_agent_system(http_request)
     agent = mas.get_agent(agent_name)
     if not agent:
         raise HTTPException(
@@ -493,48 +929,24 @@ async def get_agent_history(
             detail=f"Agent '{agent_name}' not found"
         )
 
+    history = agent.get_history()
     return {
         "agent_name": agent_name,
-        "history": agent.get_history(),
-        "message_count": len(agent.get_history())
+        "history": history,
+        "message_count": len(history)
     }
 
 
-# Error handlers
-@app.exception_handler(HTTPException)
-async def http_exception_handler(request, exc):
-    """Handle HTTP exceptions."""
-    return JSONResponse(
-        status_code=exc.status_code,
-        content=ErrorResponse(
-            error=exc.detail,
-            timestamp=datetime.utcnow().isoformat()
-        ).model_dump()
-    )
-
-
-@app.exception_handler(Exception)
-async def general_exception_handler(request, exc):
-    """Handle general exceptions."""
-    logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
-    return JSONResponse(
-        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        content=ErrorResponse(
-            error="Internal server error",
-            detail=str(exc),
-            timestamp=datetime.utcnow().isoformat()
-        ).model_dump()
-    )
-
-
 if __name__ == "__main__":
     import uvicorn
 
-    # Run the application
+    # Run the application. The default "auto" loop and HTTP implementations
+    # pick uvloop and httptools when they are installed.
     uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
+        "api.main:app",
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=1 if settings.DEBUG else settings.WORKERS,
+        reload=settings.DEBUG,
+        log_level=settings.LOG_LEVEL.lower()
     )
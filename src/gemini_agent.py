@@ -7,7 +7,13 @@ with Google's Gemini API.
 """
 
 import os
-from typing import List, Dict, Any, Optional
+import threading
+from collections import deque
+from contextlib import nullcontext
+from typing import List, Deque, Dict, Any, AsyncIterator, Callable, ContextManager, Optional, Tuple, TypeVar
+import orjson
+import anyio
+from anyio import to_thread
 from dotenv import load_dotenv
 from strands import Agent
 from strands.models.gemini import GeminiModel
@@ -16,6 +22,14 @@ from strands_tools import calculator
 # Load environment variables
 load_dotenv()
 
+# Number of user/assistant turns kept in an agent's conversation history
+DEFAULT_HISTORY_TURNS = 10
+
+# Default tools, shared by every agent that does not supply its own
+_DEFAULT_TOOLS: Tuple[Any, ...] = (calculator,)
+
+T = TypeVar("T")
+
 
 class GeminiAgent:
     """
@@ -37,7 +51,8 @@ class GeminiAgent:
         api_key: Optional[str] = None,
         tools: Optional[List] = None,
         top_p: float = 0.9,
-        top_k: int = 40
+        top_k: int = 40,
+        history_turns: int = DEFAULT_HISTORY_TURNS
     ):
         """
         Initialize the Gemini Agent using strands-agents library.
@@ -50,11 +65,24 @@ class GeminiAgent:
             tools: List of tools to make available to the agent
             top_p: Top-p sampling parameter
             top_k: Top-k sampling parameter
+            history_turns: Number of most recent turns kept in the
+                conversation history
         """
         self.model_name = model_name
         self.temperature = temperature
         self.max_tokens = max_tokens
-        self.conversation_history: List[Dict[str, str]] = []
+        self.conversation_history: Deque[Dict[str, str]] = deque(maxlen=2 * history_turns)
+
+        self._tools = _DEFAULT_TOOLS if tools is None else tools
+        self._model: Optional[GeminiModel] = None
+        self._agent: Optional[Agent] = None
+        # Serializes calls on this agent, whose strands Agent and history are
+        # mutated per call; different agents still run in parallel. Direct
+        # synchronous callers take _lock; async callers wait on _async_lock
+        # on the event loop instead, so a queued request holds no thread
+        self._lock = threading.Lock()
+        self._async_lock: Optional[anyio.Lock] = None
+        self._local = threading.local()
 
         # Configure API key
         api_key = api_key or os.getenv("GEMINI_API_KEY")
@@ -64,27 +92,102 @@ class GeminiAgent:
                 "or pass api_key parameter."
             )
 
-        # Initialize Gemini model with strands
-        self.model = GeminiModel(
-            client_args={
+        # Model and agent are built lazily on first use so that creating an
+        # agent does not touch the Gemini SDK
+        self._model_kwargs: Dict[str, Any] = {
+            "client_args": {
                 "api_key": api_key,
             },
-            model_id=model_name,
-            params={
+            "model_id": model_name,
+            "params": {
                 "temperature": temperature,
                 "max_output_tokens": max_tokens,
                 "top_p": top_p,
                 "top_k": top_k
             }
-        )
+        }
 
-        # Initialize agent with tools
-        default_tools = [calculator] if tools is None else tools
-        self.agent = Agent(model=self.model, tools=default_tools)
+    def _ensure_model(self) -> GeminiModel:
+        """
+        Build the Gemini model on first call.
 
-    def send_message(self, message: str, system_prompt: Optional[str] = None) -> str:
+        Returns:
+            The memoized Gemini model
         """
-        Send a message to the agent and get a response.
+        if self._model is None:
+            self._model = GeminiModel(**self._model_kwargs)
+        return self._model
+
+    def _ensure_agent(self) -> Agent:
+        """
+        Build the Gemini model and strands agent on first call.
+
+        Returns:
+            The memoized strands agent
+        """
+        if self._agent is None:
+            self._agent = Agent(model=self._ensure_model(), tools=list(self._tools))
+        return self._agent
+
+    @property
+    def model(self) -> GeminiModel:
+        """The underlying Gemini model, built on first access."""
+        return self._ensure_model()
+
+    @property
+    def agent(self) -> Agent:
+        """The underlying strands agent, built on first access."""
+        return self._ensure_agent()
+
+    @property
+    def async_lock(self) -> anyio.Lock:
+        """The lock serializing async callers, created on first use."""
+        if self._async_lock is None:
+            self._async_lock = anyio.Lock()
+        return self._async_lock
+
+    def _sync_lock(self) -> ContextManager:
+        """The lock for a synchronous call, or a no-op under run_locked."""
+        if getattr(self._local, "async_locked", False):
+            return nullcontext()
+        return self._lock
+
+    def _call_async_locked(self, func: Callable[..., T], *args: Any) -> T:
+        """Call func in this worker thread while run_locked holds the async lock."""
+        self._local.async_locked = True
+        try:
+            return func(*args)
+        finally:
+            self._local.async_locked = False
+
+    async def run_locked(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run a blocking method of this agent in a worker thread.
+
+        The agent's lock is awaited on the event loop before the call is
+        dispatched, so requests queued behind a busy agent do not occupy
+        worker threads.
+
+        Args:
+            func: Method of this agent to call, e.g. ``agent.summarize``
+            *args: Positional arguments for func
+
+        Returns:
+            The return value of func
+        """
+        async with self.async_lock:
+            return await to_thread.run_sync(self._call_async_locked, func, *args)
+
+    @staticmethod
+    def _format_message(message: str, system_prompt: Optional[str] = None) -> str:
+        """Prepend the system prompt to the message, if provided."""
+        if system_prompt:
+            return f"{system_prompt}\n\nUser: {message}"
+        return message
+
+    def _invoke(self, message: str, system_prompt: Optional[str] = None) -> str:
+        """
+        Send a message to the agent, letting any error propagate.
 
         Args:
             message: User message to send
@@ -93,15 +196,11 @@ class GeminiAgent:
         Returns:
             Agent's response as a string
         """
-        try:
-            # If system prompt provided, prepend it
-            if system_prompt:
-                full_message = f"{system_prompt}\n\nUser: {message}"
-            else:
-                full_message = message
+        full_message = self._format_message(message, system_prompt)
 
+        with self._sync_lock():
             # Send message and get response
-            response = self.agent(full_message)
+            response = str(self._ensure_agent()(full_message))
 
             # Store in conversation history
             self.conversation_history.append({
@@ -110,16 +209,144 @@ class GeminiAgent:
             })
             self.conversation_history.append({
                 "role": "assistant",
-                "content": str(response)
+                "content": response
             })
 
-            return str(response)
+        return response
+
+    def send_message(self, message: str, system_prompt: Optional[str] = None) -> str:
+        """
+        Send a message to the agent and get a response.
+
+        Args:
+            message: User message to send
+            system_prompt: Optional system prompt to guide the response
+
+        Returns:
+            Agent's response as a string
+        """
+        try:
+            return self._invoke(message, system_prompt)
 
         except Exception as e:
             error_msg = f"Error generating response: {str(e)}"
             print(error_msg)
             return error_msg
 
+    async def _stream_events(
+        self,
+        message: str,
+        system_prompt: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Send a message to the agent and yield the strands stream events.
+
+        The final response is stored in the conversation history once the
+        stream completes.
+
+        Args:
+            message: User message to send
+            system_prompt: Optional system prompt to guide the response
+
+        Yields:
+            Events from the strands agent's stream_async
+        """
+        chunks: List[str] = []
+        response: Optional[str] = None
+        full_message = self._format_message(message, system_prompt)
+
+        async with self.async_lock:
+            async for event in self._ensure_agent().stream_async(full_message):
+                if "result" in event:
+                    response = str(event["result"])
+                elif event.get("data"):
+                    chunks.append(event["data"])
+                yield event
+
+            # Store in conversation history once the response is complete
+            self.conversation_history.append({
+                "role": "user",
+                "content": message
+            })
+            self.conversation_history.append({
+                "role": "assistant",
+                "content": self._final_response(response, chunks)
+            })
+
+    @staticmethod
+    def _final_response(response: Optional[str], chunks: List[str]) -> str:
+        """
+        Pick the response text at the end of a stream.
+
+        The final result holds only the last assistant message, matching
+        send_message; the streamed chunks can also include text generated
+        before a tool call, so they are only joined when no result came.
+        """
+        return response if response is not None else "".join(chunks)
+
+    async def stream_message(
+        self,
+        message: str,
+        system_prompt: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Send a message to the agent and stream the response text as it is generated.
+
+        Unlike send_message, errors are raised rather than returned as text,
+        so a failure part-way through cannot be mistaken for model output.
+
+        Args:
+            message: User message to send
+            system_prompt: Optional system prompt to guide the response
+
+        Yields:
+            Chunks of the agent's response text
+        """
+        async for event in self._stream_events(message, system_prompt):
+            chunk = event.get("data")
+            if chunk:
+                yield chunk
+
+    async def send_message_async(self, message: str, system_prompt: Optional[str] = None) -> str:
+        """
+        Send a message to the agent and get a response, without blocking the event loop.
+
+        Returns the same final message as send_message, but raises errors
+        rather than returning them as text.
+
+        Args:
+            message: User message to send
+            system_prompt: Optional system prompt to guide the response
+
+        Returns:
+            Agent's response as a string
+        """
+        chunks: List[str] = []
+        response: Optional[str] = None
+        async for event in self._stream_events(message, system_prompt):
+            if "result" in event:
+                response = str(event["result"])
+            elif event.get("data"):
+                chunks.append(event["data"])
+        return self._final_response(response, chunks)
+
+    def complete(self, prompt: str) -> str:
+        """
+        Send a one-off prompt outside the conversation.
+
+        The prompt runs on a fresh strands agent with this agent's model and
+        tools, so the response neither depends on nor is added to the
+        conversation history, and no lock is taken. Errors are raised.
+
+        Args:
+            prompt: Prompt to send
+
+        Returns:
+            Agent's response as a string
+        """
+        agent = Agent(model=self._ensure_model(), tools=list(self._tools))
+        return str(agent(prompt))
+
     def send_message_with_context(
         self,
         message: str,
@@ -135,25 +362,32 @@ class GeminiAgent:
         Returns:
             Agent's response
         """
-        context_str = "\n".join([f"{k}: {v}" for k, v in context.items()])
+        context_str = "\n".join(f"{k}: {v}" for k, v in context.items())
         full_message = f"Context:\n{context_str}\n\nUser Query: {message}"
         return self.send_message(full_message)
 
     def clear_history(self):
-        """Clear the conversation history and restart the agent."""
-        self.conversation_history = []
-        # Recreate the agent to clear its internal history
-        default_tools = [calculator]
-        self.agent = Agent(model=self.model, tools=default_tools)
+        """Clear the conversation history, including the agent's internal history."""
+        with self._sync_lock():
+            self.conversation_history.clear()
+            if self._agent is None:
+                return
+            try:
+                # Reset the strands agent's message list in place
+                self._agent.messages.clear()
+            except AttributeError:
+                # Drop the agent instead; it is rebuilt lazily on the next
+                # message, reusing the already-built model
+                self._agent = None
 
     def get_history(self) -> List[Dict[str, str]]:
         """
         Get the conversation history.
 
         Returns:
-            List of conversation messages
+            List of the most recent conversation messages
         """
-        return self.conversation_history
+        return list(self.conversation_history)
 
     def generate_structured_response(
         self,
@@ -187,11 +421,15 @@ class GeminiAgent:
         Returns:
             Summary of the text
         """
-        prompt = (
+        return self.send_message(self.summary_prompt(text, max_length))
+
+    @staticmethod
+    def summary_prompt(text: str, max_length: int = 200) -> str:
+        """Build the prompt used by summarize."""
+        return (
             f"Please provide a concise summary of the following text "
             f"in no more than {max_length} words:\n\n{text}"
         )
-        return self.send_message(prompt)
 
     def analyze_sentiment(self, text: str) -> str:
         """
@@ -203,12 +441,16 @@ class GeminiAgent:
         Returns:
             Sentiment analysis result
         """
-        prompt = (
+        return self.send_message(self.sentiment_prompt(text))
+
+    @staticmethod
+    def sentiment_prompt(text: str) -> str:
+        """Build the prompt used by analyze_sentiment."""
+        return (
             f"Analyze the sentiment of the following text. "
             f"Provide the overall sentiment (positive, negative, neutral) "
             f"and a brief explanation:\n\n{text}"
         )
-        return self.send_message(prompt)
 
     def extract_entities(self, text: str) -> str:
         """
@@ -227,6 +469,51 @@ class GeminiAgent:
         )
         return self.generate_structured_response(prompt, "json")
 
+    def analyze_all(self, text: str, max_length: int = 200) -> Dict[str, Any]:
+        """
+        Summarize, analyze sentiment and extract entities in a single request.
+
+        Args:
+            text: Text to analyze
+            max_length: Maximum length of summary in words
+
+        Returns:
+            Dictionary with "summary", "sentiment" and "entities" keys
+
+        Raises:
+            ValueError: If the response is not a JSON object
+            Exception: Any error raised by the underlying agent
+        """
+        prompt = (
+            f"Analyze the following text. Return only a JSON object with these keys:\n"
+            f"- \"summary\": a concise summary in no more than {max_length} words\n"
+            f"- \"sentiment\": the overall sentiment (positive, negative, neutral) "
+            f"and a brief explanation\n"
+            f"- \"entities\": an object mapping categories like person, organization, "
+            f"location, date, etc. to lists of named entities\n\n{text}"
+        )
+        # Call the agent directly so upstream errors propagate instead of
+        # being returned as text and reported as invalid JSON
+        response = self._invoke(prompt).strip()
+
+        # Strip a surrounding Markdown code fence, if any
+        if response.startswith("```"):
+            response = response.split("\n", 1)[-1].rsplit("```", 1)[0]
+
+        try:
+            result = orjson.loads(response)
+        except orjson.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in analysis response: {e}") from e
+        if not isinstance(result, dict):
+            raise ValueError("Analysis response is not a JSON object")
+
+        entities = result.get("entities")
+        return {
+            "summary": str(result.get("summary", "")),
+            "sentiment": str(result.get("sentiment", "")),
+            "entities": entities if isinstance(entities, dict) else {}
+        }
+
     def answer_question(
         self,
         question: str,
@@ -242,16 +529,18 @@ class GeminiAgent:
         Returns:
             Answer to the question
         """
+        return self.send_message(self.question_prompt(question, context))
+
+    @staticmethod
+    def question_prompt(question: str, context: Optional[str] = None) -> str:
+        """Build the prompt used by answer_question."""
         if context:
-            prompt = (
+            return (
                 f"Based on the following context, answer the question.\n\n"
                 f"Context: {context}\n\n"
                 f"Question: {question}"
             )
-        else:
-            prompt = question
-
-        return self.send_message(prompt)
+        return question
 
 
 class MultiAgentSystem:
@@ -259,14 +548,16 @@ class MultiAgentSystem:
     A system managing multiple specialized agents using strands-agents library.
     """
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, history_turns: int = DEFAULT_HISTORY_TURNS):
         """
         Initialize the multi-agent system.
 
         Args:
             api_key: Google API key
+            history_turns: Number of most recent turns each agent keeps in its history
         """
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
+        self.history_turns = history_turns
         self.agents: Dict[str, GeminiAgent] = {}
 
     def create_agent(
@@ -292,7 +583,8 @@ class MultiAgentSystem:
             model_name=model_name,
             temperature=temperature,
             api_key=self.api_key,
-            tools=tools
+            tools=tools,
+            history_turns=self.history_turns
         )
         self.agents[name] = agent
         return agent
@@ -0,0 +1,6 @@
+"""Shared pytest configuration."""
+
+import os
+
+# api/config.py requires an API key at import; no request reaches Gemini in tests
+os.environ.setdefault("GEMINI_API_KEY", "test-api-key")
@@ -0,0 +1,259 @@
+"""Tests for the FastAPI application."""
+
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import main
+from api.main import app
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_app_imports_as_documented():
+    # claude.md launches the app from the repository root as api.main:app,
+    # with gemini_agent installed; PYTHONPATH stands in for the install here
+    env = {**os.environ, "PYTHONPATH": str(REPO_ROOT / "src")}
+    result = subprocess.run(
+        [sys.executable, "-c", "from uvicorn.importer import import_from_string; import_from_string('api.main:app')"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True
+    )
+
+    assert result.returncode == 0, result.stderr
+
+
+def test_unknown_agent_returns_error_envelope(client):
+    response = client.post("/message", json={"message": "Hello", "agent_name": "missing"})
+
+    assert response.status_code == 404
+    assert response.headers["content-type"] == "application/json"
+    body = response.json()
+    assert body["error"] == "Agent 'missing' not found"
+    assert body["detail"] is None
+    assert body["timestamp"]
+
+
+def test_unknown_route_returns_error_envelope(client):
+    response = client.get("/does-not-exist")
+
+    assert response.status_code == 404
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["error"] == "Not Found"
+
+
+def test_cors_preflight_is_answered_directly(client):
+    response = client.options(
+        "/message",
+        headers={
+            "Origin": "https://example.com",
+            "Access-Control-Request-Method": "POST",
+            "Access-Control-Request-Headers": "content-type, x-request-id",
+        },
+    )
+
+    assert response.status_code == 204
+    assert response.headers["access-control-allow-origin"] == "https://example.com"
+    assert response.headers["access-control-allow-credentials"] == "true"
+    assert "POST" in response.headers["access-control-allow-methods"]
+    assert response.headers["access-control-allow-headers"] == "content-type, x-request-id"
+    assert response.headers["access-control-max-age"] == "600"
+
+
+def test_cors_simple_request_echoes_origin(client):
+    response = client.get("/health", headers={"Origin": "https://example.com"})
+
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == "https://example.com"
+    assert response.headers["access-control-allow-credentials"] == "true"
+    assert response.headers["vary"] == "Origin"
+
+
+def test_same_origin_request_has_no_cors_headers(client):
+    response = client.get("/health")
+
+    assert response.status_code == 200
+    assert not any(name.startswith("access-control-") for name in response.headers)
+    assert "vary" not in response.headers
+
+
+class FailingStrandsAgent:
+    """Stand-in for the strands Agent that fails part-way through a reply."""
+
+    def __init__(self):
+        self.messages = []
+
+    async def stream_async(self, message):
+        yield {"data": "Partial"}
+        raise RuntimeError("upstream failure")
+
+
+def test_stream_failure_sends_error_event(client):
+    app.state.agent_system.get_agent("default")._agent = FailingStrandsAgent()
+
+    response = client.post("/message/stream", json={"message": "Hello"})
+
+    assert response.status_code == 200
+    assert response.text == (
+        'data: {"delta":"Partial"}\n\n'
+        'event: error\n'
+        'data: {"error":"Error generating response: upstream failure"}\n\n'
+    )
+
+
+def test_message_failure_returns_error_envelope(client):
+    app.state.agent_system.get_agent("default")._agent = FailingStrandsAgent()
+
+    response = client.post("/message", json={"message": "Hello"})
+
+    assert response.status_code == 500
+    assert response.json()["error"] == "Error processing message: upstream failure"
+
+
+def test_analyze_rejects_text_over_limit(client):
+    response = client.post("/analyze", json={"text": "a" * 100_001})
+
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("path", ["/summarize", "/sentiment"])
+def test_oversized_body_is_rejected_before_parsing(client, path):
+    body = b"x" * (main.settings.MAX_BODY_BYTES + 1)
+
+    response = client.post(
+        path,
+        content=body,
+        headers={"Content-Type": "application/json", "Origin": "https://example.com"},
+    )
+
+    assert response.status_code == 413
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["error"] == "Request body too large"
+    assert response.headers["access-control-allow-origin"] == "https://example.com"
+
+
+def test_response_cache_evicts_least_recently_used():
+    cache = main.ResponseCache(maxsize=2, ttl=60)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    assert cache.get("a") == "A"
+
+    cache.set("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+
+
+def test_response_cache_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(main.time, "monotonic", lambda: now[0])
+    cache = main.ResponseCache(maxsize=2, ttl=10)
+    cache.set("a", "A")
+
+    now[0] = 109.0
+    assert cache.get("a") == "A"
+    now[0] = 111.0
+    assert cache.get("a") is None
+
+
+def test_low_temperature_summaries_are_cached_statelessly(client, monkeypatch):
+    monkeypatch.setattr(main, "response_cache", main.ResponseCache(8, 60))
+    client.post("/agents", json={"name": "precise", "temperature": 0.2})
+    agent = app.state.agent_system.get_agent("precise")
+    prompts = []
+
+    def complete(prompt):
+        prompts.append(prompt)
+        return "A summary"
+
+    monkeypatch.setattr(agent, "complete", complete)
+
+    for _ in range(2):
+        response = client.post("/summarize", json={"text": "Some text", "agent_name": "precise"})
+        assert response.status_code == 200
+        assert response.json()["response"] == "A summary"
+
+    assert len(prompts) == 1
+    assert agent.get_history() == []
+
+
+def test_low_temperature_errors_are_not_cached(client, monkeypatch):
+    monkeypatch.setattr(main, "response_cache", main.ResponseCache(8, 60))
+    client.post("/agents", json={"name": "precise", "temperature": 0.2})
+    agent = app.state.agent_system.get_agent("precise")
+    calls = []
+
+    def complete(prompt):
+        calls.append(prompt)
+        raise RuntimeError("quota exceeded")
+
+    monkeypatch.setattr(agent, "complete", complete)
+
+    for _ in range(2):
+        response = client.post("/sentiment", json={"text": "Great!", "agent_name": "precise"})
+        assert response.status_code == 500
+        assert response.json()["error"] == "Error analyzing sentiment: quota exceeded"
+
+    assert len(calls) == 2
+
+
+class ListHandler(logging.Handler):
+    """Handler that collects the messages the log listener writes."""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.written = threading.Event()
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+        self.written.set()
+
+
+@pytest.fixture
+def written_logs(monkeypatch):
+    handler = ListHandler()
+    monkeypatch.setattr(main.log_listener, "handlers", (*main.log_listener.handlers, handler))
+    # pytest installs its own root handlers first, which turns the module's
+    # basicConfig into a no-op, so route the app logger to the queue here
+    monkeypatch.setattr(main.logger, "handlers", [main._queue_handler])
+    monkeypatch.setattr(main.logger, "propagate", False)
+    main.logger.setLevel(logging.INFO)
+    yield handler
+    main.logger.setLevel(logging.NOTSET)
+
+
+def test_logs_are_written_without_lifespan(written_logs):
+    main.logger.info("Logged outside the app lifespan")
+
+    assert written_logs.written.wait(timeout=1)
+    assert written_logs.messages == ["Logged outside the app lifespan"]
+
+
+def test_startup_failure_is_logged(monkeypatch, written_logs):
+    def fail(*args, **kwargs):
+        raise RuntimeError("bad config")
+
+    monkeypatch.setattr(main.MultiAgentSystem, "create_agent", fail)
+
+    with pytest.raises(RuntimeError, match="bad config"):
+        with TestClient(app):
+            pass
+
+    deadline = time.monotonic() + 1
+    while "Failed to initialize agent system: bad config" not in written_logs.messages:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
@@ -0,0 +1,185 @@
+"""Tests for GeminiAgent."""
+
+import asyncio
+
+import pytest
+from anyio import to_thread
+
+from gemini_agent import GeminiAgent, MultiAgentSystem
+
+
+class FakeStrandsAgent:
+    """Stand-in for the strands Agent that streams a fixed reply."""
+
+    def __init__(self):
+        self.messages = []
+
+    async def stream_async(self, message):
+        yield {"data": "Hello"}
+        yield {"data": " world"}
+
+
+def make_agent() -> GeminiAgent:
+    agent = GeminiAgent(api_key="test-api-key")
+    agent._agent = FakeStrandsAgent()
+    return agent
+
+
+async def collect(agent: GeminiAgent, message: str) -> str:
+    return "".join([chunk async for chunk in agent.stream_message(message)])
+
+
+def test_cancelled_lock_waiter_does_not_hold_lock():
+    agent = make_agent()
+
+    async def scenario():
+        # Another call holds the lock while a streaming caller waits and times out
+        async with agent.async_lock:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(collect(agent, "first"), timeout=0.05)
+
+        assert not agent.async_lock.locked()
+        return await asyncio.wait_for(collect(agent, "second"), timeout=1)
+
+    assert asyncio.run(scenario()) == "Hello world"
+    assert not agent.async_lock.locked()
+    assert agent.get_history()[-1] == {"role": "assistant", "content": "Hello world"}
+
+
+class EchoStrandsAgent:
+    """Stand-in for the strands Agent that echoes the message back."""
+
+    def __init__(self):
+        self.messages = []
+
+    def __call__(self, message):
+        return message
+
+
+def test_waiters_on_busy_agent_do_not_hold_threads():
+    busy = make_agent()
+    idle = GeminiAgent(api_key="test-api-key")
+    idle._agent = EchoStrandsAgent()
+
+    async def scenario():
+        to_thread.current_default_thread_limiter().total_tokens = 1
+        async with busy.async_lock:
+            waiters = [
+                asyncio.create_task(busy.run_locked(busy.send_message, "queued"))
+                for _ in range(3)
+            ]
+            await asyncio.sleep(0)
+            # The only worker thread is still free for another agent
+            answer = await asyncio.wait_for(idle.run_locked(idle.send_message, "hi"), timeout=1)
+            for waiter in waiters:
+                waiter.cancel()
+        return answer
+
+    assert asyncio.run(scenario()) == "hi"
+    assert not busy._lock.locked()
+    assert busy.get_history() == []
+
+
+class RaisingStrandsAgent:
+    """Stand-in for the strands Agent whose call fails upstream."""
+
+    def __init__(self):
+        self.messages = []
+
+    def __call__(self, message):
+        raise RuntimeError("quota exceeded")
+
+
+class JsonStrandsAgent:
+    """Stand-in for the strands Agent that replies with fenced JSON."""
+
+    def __init__(self):
+        self.messages = []
+
+    def __call__(self, message):
+        return (
+            '```json\n'
+            '{"summary": "Short", "sentiment": "neutral", "entities": {"person": ["Ada"]}}\n'
+            '```'
+        )
+
+
+def test_analyze_all_parses_fenced_json():
+    agent = GeminiAgent(api_key="test-api-key")
+    agent._agent = JsonStrandsAgent()
+
+    assert agent.analyze_all("Ada wrote a note.") == {
+        "summary": "Short",
+        "sentiment": "neutral",
+        "entities": {"person": ["Ada"]}
+    }
+
+
+def test_analyze_all_raises_upstream_error():
+    agent = GeminiAgent(api_key="test-api-key")
+    agent._agent = RaisingStrandsAgent()
+
+    with pytest.raises(RuntimeError, match="quota exceeded"):
+        agent.analyze_all("Some text")
+    assert not agent._lock.locked()
+
+
+def test_agents_build_models_from_their_own_settings():
+    mas = MultiAgentSystem(api_key="test-api-key")
+    cool = mas.create_agent("cool", temperature=0.2)
+    warm = mas.create_agent("warm", temperature=0.9)
+
+    assert cool.model.config["params"]["temperature"] == 0.2
+    assert warm.model.config["params"]["temperature"] == 0.9
+    assert cool.model is not warm.model
+
+
+class ToolStrandsAgent:
+    """Stand-in for the strands Agent that streams text around a tool call."""
+
+    def __init__(self):
+        self.messages = []
+
+    async def stream_async(self, message):
+        yield {"data": "Let me calculate that."}
+        yield {"data": "The answer is 4."}
+        yield {"result": "The answer is 4."}
+
+
+def test_send_message_async_returns_final_result():
+    agent = GeminiAgent(api_key="test-api-key")
+    agent._agent = ToolStrandsAgent()
+
+    assert asyncio.run(agent.send_message_async("What is 2+2?")) == "The answer is 4."
+    assert agent.get_history()[-1] == {"role": "assistant", "content": "The answer is 4."}
+
+
+def test_history_keeps_only_recent_turns():
+    agent = GeminiAgent(api_key="test-api-key", history_turns=2)
+    agent._agent = EchoStrandsAgent()
+
+    for i in range(5):
+        agent.send_message(f"message {i}")
+
+    assert agent.get_history() == [
+        {"role": "user", "content": "message 3"},
+        {"role": "assistant", "content": "message 3"},
+        {"role": "user", "content": "message 4"},
+        {"role": "assistant", "content": "message 4"},
+    ]
+
+
+def test_clear_history_resets_agent_in_place():
+    agent = GeminiAgent(api_key="test-api-key")
+    strands_agent = EchoStrandsAgent()
+    agent._agent = strands_agent
+    agent.send_message("Hello")
+    strands_agent.messages.append({"role": "user", "content": [{"text": "Hello"}]})
+    messages = strands_agent.messages
+
+    agent.clear_history()
+
+    assert agent.get_history() == []
+    assert agent._agent is strands_agent
+    assert strands_agent.messages is messages
+    assert messages == []